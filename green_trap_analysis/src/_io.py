@@ -0,0 +1,14 @@
+"""
+File output helpers shared by the data loaders and the preprocessor
+"""
+
+
+def write_csv(df, path):
+    """Writes `df` as CSV with pyarrow's C writer, falling back to pandas."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df.to_csv(path, index=False)
+        return
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
@@ -0,0 +1,451 @@
+"""
+Shared WDI fetch pipeline for Green Trap Analysis
+Used by data_loader (one attempt per chunk) and dataloader_robust (retries)
+"""
+import pandas as pd
+import numpy as np
+from . import config
+from ._io import write_csv
+from .data_quality import generate_data_quality_report, profile_data, validate_data
+import asyncio
+import functools
+import os
+import shutil
+import tempfile
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+
+try:
+    import aiohttp
+except ImportError:  # optional: falls back to threaded wbgapi fetches
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# Fixed for the lifetime of the process: built once, not per fetch
+_INDICATOR_CODES = tuple(config.WDI_CODE_TO_NAME)
+_RENAME_DICT = {'economy': 'Country_Code', 'time': 'Year', **config.WDI_CODE_TO_NAME}
+# Every configured country is a category, fetched or cached, present or not
+_COUNTRY_DTYPE = pd.CategoricalDtype(config.ALL_COUNTRIES)
+
+# World Bank REST endpoint used by the async fetch path (source 2 = WDI)
+_WB_API_URL = 'https://api.worldbank.org/v2/country/{countries}/indicator/{indicator}'
+_ASYNC_TIMEOUT_S = 60  # per request; a stalled connection counts as a failed attempt
+
+# Backoff policy of fetch_with_retry, also applied per request on the async path
+_RETRY_ATTEMPTS = 3
+_RETRY_DELAY_S = 10
+
+
+@functools.lru_cache(maxsize=None)
+def _fetch_plan(chunk_years):
+    """
+    Builds the request list and country dtype for the configured fetch.
+
+    Every indicator is requested separately for each year chunk, so the
+    requests are small and independent. The config is fixed for the
+    process, so each chunk size is planned once.
+
+    Returns:
+        tuple: ((indicator, start, end), ...) requests, pd.CategoricalDtype of countries
+    """
+    years = list(range(config.START_YEAR, config.END_YEAR + 1))
+    chunk_ranges = [
+        (years[i], years[min(i + chunk_years - 1, len(years) - 1)])
+        for i in range(0, len(years), chunk_years)
+    ]
+    requests = tuple(
+        (indicator, start, end)
+        for indicator in _INDICATOR_CODES for start, end in chunk_ranges
+    )
+    return requests, _COUNTRY_DTYPE
+
+
+def _cache_partitioning():
+    """Hive-style Country_Code partitioning shared by cache reads and writes."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([('Country_Code', pa.string())]), flavor='hive')
+
+
+def _read_cache(path, countries=None):
+    """
+    Loads the cached WDI frame.
+
+    The cache is a Feather dataset with one directory per country, so a
+    `countries` filter only opens the files for those countries.
+
+    Args:
+        path: Cache directory
+        countries: Optional iterable of country codes to load
+
+    Returns:
+        pd.DataFrame: Wide format [Country, Year, Var1, Var2...]
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='feather', partitioning=_cache_partitioning())
+    if countries is None:
+        table = dataset.to_table()
+    else:
+        table = dataset.to_table(filter=ds.field('Country_Code').isin(list(countries)))
+    df = table.to_pandas()
+    # Partition columns come back last; restore the [Country, Year, ...] layout
+    # with the same categories as a fresh fetch
+    df.insert(0, 'Country_Code', df.pop('Country_Code').astype(_COUNTRY_DTYPE))
+    return df
+
+
+def _write_cache(df, path):
+    """Replaces the cache at `path` with `df`, one Feather file per country."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # Write into a fresh sibling directory (its mtime is the cache age) and
+    # swap it in, so a failed write leaves the previous cache in place
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp = tempfile.mkdtemp(prefix='.wb_cache-', dir=parent)
+    try:
+        ds.write_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            tmp,
+            format='feather',
+            partitioning=_cache_partitioning(),
+            existing_data_behavior='overwrite_or_ignore'
+        )
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    old = None
+    if os.path.exists(path):
+        old = tmp + '.old'
+        os.replace(path, old)
+    os.replace(tmp, path)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _downcast(df):
+    """
+    Shrinks the wide WDI frame: float32 indicators, int16 years and a
+    categorical country code. Safe to apply more than once.
+    """
+    for col in df.select_dtypes(include=['float64']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    df['Year'] = df['Year'].astype(np.int16)
+    df['Country_Code'] = df['Country_Code'].astype('category')
+    return df
+
+
+def fetch_with_retry(indicator_codes, countries, years, max_retries=_RETRY_ATTEMPTS, delay=_RETRY_DELAY_S):
+    """
+    Fetch data with exponential backoff retry logic.
+
+    Args:
+        indicator_codes: List of WDI indicator codes
+        countries: List of country codes
+        years: Range of years
+        max_retries: Maximum number of retry attempts
+        delay: Initial delay between retries (seconds)
+
+    Returns:
+        pd.DataFrame or None: Index=(economy, time), Columns=series
+    """
+    # Imported on first fetch so importing the package doesn't load wbgapi
+    # and its HTTP stack
+    import wbgapi as wb
+
+    for attempt in range(max_retries):
+        try:
+            logger.info("   Attempt %d/%d...", attempt + 1, max_retries)
+
+            # Ask wbgapi for (economy, time) rows and one column per series so
+            # no melt/pivot round-trip is needed afterwards
+            df = wb.data.DataFrame(
+                indicator_codes,
+                economy=countries,
+                time=years,
+                index=['economy', 'time'],
+                columns='series',
+                numericTimeKeys=True,
+                labels=False
+            )
+
+            if not df.empty:
+                logger.info("   ✅ Success on attempt %d", attempt + 1)
+                return df
+            else:
+                logger.warning("   ⚠️ Empty response on attempt %d", attempt + 1)
+
+        except Exception as e:
+            logger.error("   ❌ Attempt %d failed: %.100s", attempt + 1, e)
+
+            if attempt < max_retries - 1:
+                wait_time = delay * (2 ** attempt)  # Exponential backoff
+                logger.info("   ⏳ Waiting %d seconds before retry...", wait_time)
+                time.sleep(wait_time)
+            else:
+                logger.error("   💥 All %d attempts failed", max_retries)
+                return None
+
+    return None
+
+
+def _fetch_one_chunk(indicator, countries, chunk_start, chunk_end, max_retries):
+    """
+    Fetches one indicator for a single year range.
+
+    Returns:
+        tuple: (indicator, pd.Series indexed by (economy, time) or None)
+    """
+    logger.info("\n📥 Fetching %s %d-%d...", indicator, chunk_start, chunk_end)
+
+    chunk_df = fetch_with_retry(
+        [indicator],
+        countries,
+        range(chunk_start, chunk_end + 1),
+        max_retries=max_retries
+    )
+
+    if chunk_df is None or chunk_df.empty:
+        logger.error("  ❌ Chunk %s %d-%d failed", indicator, chunk_start, chunk_end)
+        logger.info("  ℹ️ Continuing with other chunks...")
+        return indicator, None
+
+    logger.info("  ✅ Chunk %s %d-%d: %d rows fetched", indicator, chunk_start, chunk_end, len(chunk_df))
+    return indicator, chunk_df[indicator]
+
+
+def _fetch_chunks_threaded(requests, countries, max_workers, max_retries):
+    """
+    Fetches every (indicator, year chunk) request through wbgapi on a thread pool.
+
+    Returns:
+        list[tuple]: (indicator, pd.Series or None) per request
+    """
+    # I/O-bound HTTP calls release the GIL, so threads overlap the waits
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as ex:
+        futures = [
+            ex.submit(_fetch_one_chunk, indicator, countries, start, end, max_retries)
+            for indicator, start, end in requests
+        ]
+        return [future.result() for future in as_completed(futures)]
+
+
+def _async_available():
+    """True if aiohttp is installed and no event loop is already running."""
+    if aiohttp is None:
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False  # e.g. inside Jupyter: asyncio.run() would fail
+
+
+async def _fetch_one(session, sem, indicator, start, end, countries, max_retries):
+    """
+    Fetches one indicator for one year range from the World Bank REST API,
+    with the same exponential backoff as fetch_with_retry.
+
+    Args:
+        max_retries: Attempts for this request
+
+    Returns:
+        tuple: (indicator, pd.Series indexed by (economy, time) or None)
+    """
+    url = _WB_API_URL.format(countries=';'.join(countries), indicator=indicator)
+    params = {'date': f'{start}:{end}', 'format': 'json', 'per_page': 20000, 'source': 2}
+
+    for attempt in range(max_retries):
+        try:
+            async with sem:
+                async with session.get(url, params=params) as resp:
+                    resp.raise_for_status()
+                    payload = await resp.json(content_type=None)
+            break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("   ❌ %s %d-%d attempt %d failed: %.100r",
+                         indicator, start, end, attempt + 1, e)
+            if attempt == max_retries - 1:
+                raise
+            # Back off outside the semaphore so other requests keep going
+            await asyncio.sleep(_RETRY_DELAY_S * (2 ** attempt))
+
+    # Errors come back as a single [{"message": ...}] element
+    if len(payload) < 2 or not payload[1]:
+        return indicator, None
+
+    rows = payload[1]
+    index = pd.MultiIndex.from_arrays(
+        [[r['countryiso3code'] for r in rows], [int(r['date']) for r in rows]],
+        names=['economy', 'time']
+    )
+    values = [np.nan if r['value'] is None else r['value'] for r in rows]
+    return indicator, pd.Series(values, index=index, name=indicator, dtype='float64')
+
+
+async def _fetch_all_async(requests, countries, max_workers, max_retries):
+    """Issues every (indicator, year chunk) request, at most `max_workers` at a time."""
+    sem = asyncio.Semaphore(max_workers)
+    timeout = aiohttp.ClientTimeout(total=_ASYNC_TIMEOUT_S)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(
+            *[_fetch_one(session, sem, indicator, start, end, countries, max_retries)
+              for indicator, start, end in requests],
+            return_exceptions=True
+        )
+
+
+def _fetch_chunks_async(requests, countries, max_workers, max_retries):
+    """
+    Fetches every (indicator, year chunk) request with aiohttp.
+
+    Concurrency and attempts per request follow the same `max_workers` and
+    `max_retries` as the threaded wbgapi path.
+
+    Returns:
+        list[tuple]: (indicator, pd.Series or None) per successful request
+    """
+    logger.info("Fetching %d requests via aiohttp...", len(requests))
+    results = asyncio.run(_fetch_all_async(requests, countries, max_workers, max_retries))
+
+    fetched = []
+    for result in results:
+        # BaseException: gather() also hands back CancelledError
+        if isinstance(result, BaseException):
+            logger.error("  ❌ Request failed: %s", result)
+        else:
+            fetched.append(result)
+    return fetched
+
+
+def _stitch(results):
+    """
+    Joins per-request series into one wide frame.
+
+    Year chunks of an indicator are stacked, then the indicators are laid
+    side by side.
+
+    Returns:
+        pd.DataFrame or None: Index=(economy, time), Columns=series
+    """
+    by_indicator = {}
+    for indicator, series in results:
+        if series is not None:
+            by_indicator.setdefault(indicator, []).append(series)
+
+    if not by_indicator:
+        return None
+
+    logger.info("  ✅ Success: %d series fetched", len(by_indicator))
+    wide = pd.concat(
+        {indicator: pd.concat(parts) for indicator, parts in by_indicator.items()},
+        axis=1
+    )
+    return wide.sort_index().sort_index(axis=1)
+
+
+def fetch(*, chunk_years=5, use_cache=True, max_retries=1, max_workers=8,
+          use_async=True, write_outputs=False):
+    """
+    Fetches, reshapes, validates and caches WDI data.
+
+    Args:
+        chunk_years: Number of years to fetch per API call
+        use_cache: If True, load from cache if it is less than 24 hours old
+        max_retries: Attempts per request, with exponential backoff
+        max_workers: Maximum number of requests fetched concurrently
+        use_async: If True and aiohttp is installed, issue one request per
+            (indicator, chunk) concurrently instead of using wbgapi
+        write_outputs: If True, also write the data quality report and the
+            raw CSV after a fresh fetch
+
+    Returns:
+        pd.DataFrame: Wide format [Country, Year, Var1, Var2...]
+    """
+    # Check cache first (a single stat call covers existence and age)
+    try:
+        cache_stat = os.stat(config.CACHE_DIR) if use_cache else None
+    except FileNotFoundError:
+        cache_stat = None
+
+    if cache_stat is not None:
+        try:
+            cache_age_hours = (time.time() - cache_stat.st_mtime) / 3600
+
+            if cache_age_hours < 24:  # Cache valid for 24 hours
+                logger.info("📦 Loading from cache (age: %.1f hours)", cache_age_hours)
+                return _downcast(_read_cache(config.CACHE_DIR))
+            else:
+                logger.info("⏰ Cache expired, fetching new data...")
+        except Exception as e:
+            logger.warning("⚠️ Could not read cache: %s. Fetching fresh data.", e)
+
+    # Prepare fetch
+    indicator_codes = _INDICATOR_CODES
+    countries = config.ALL_COUNTRIES
+    use_async = use_async and _async_available()
+
+    logger.info("=" * 60)
+    logger.info("🌍 GREEN TRAP ANALYSIS - DATA FETCH")
+    logger.info("=" * 60)
+    logger.info("📊 Indicators: %d", len(indicator_codes))
+    logger.info("🌐 Countries: %d", len(countries))
+    logger.info("📅 Period: %d - %d", config.START_YEAR, config.END_YEAR)
+    logger.info("🇹🇷 Turkey included: %s", 'TUR' in countries)
+    logger.info("🔁 Max retries per request: %d", max_retries)
+    logger.info("=" * 60)
+
+    requests, country_dtype = _fetch_plan(chunk_years)
+    if use_async:
+        results = _fetch_chunks_async(requests, countries, max_workers, max_retries)
+    else:
+        results = _fetch_chunks_threaded(requests, countries, max_workers, max_retries)
+
+    # Combine chunks: each (indicator, year range) cell is fetched once
+    logger.info("\n🔄 Combining chunks...")
+    wide = _stitch(results)
+
+    if wide is None:
+        logger.error("💥 CRITICAL: No data fetched from any chunk!")
+        logger.error("   The World Bank API may be down.")
+        logger.error("   Please try again later or use Solution 3 (manual download).")
+        return pd.DataFrame()
+
+    df_final = wide.reset_index()
+
+    # Clean up
+    df_final = df_final.rename(columns=_RENAME_DICT)
+    df_final['Year'] = pd.to_numeric(df_final['Year'], downcast='integer')
+    df_final['Country_Code'] = df_final['Country_Code'].astype(country_dtype)
+
+    # Validate
+    logger.info("\n🔍 Validating data...")
+    profile = profile_data(df_final)
+    validation_passed = validate_data(df_final, profile)
+
+    if not validation_passed:
+        logger.warning("⚠️ Data validation found issues (see above)")
+
+    # Cache the result
+    df_final = _downcast(df_final)
+    logger.info("\n💾 Caching data to %s", config.CACHE_DIR)
+    config.ensure_dirs()
+    _write_cache(df_final, config.CACHE_DIR)
+
+    logger.info("\n✅ Data fetch complete: %s", df_final.shape)
+    logger.info("   Countries: %d", df_final['Country_Code'].nunique())
+    logger.info("   Years: %d - %d", df_final['Year'].min(), df_final['Year'].max())
+
+    if write_outputs:
+        # Generate quality report
+        generate_data_quality_report(df_final, profile)
+
+        # Save raw data
+        write_csv(df_final, config.RAW_DATA_PATH)
+        logger.info("✅ Raw data saved to: %s", config.RAW_DATA_PATH)
+
+    return df_final
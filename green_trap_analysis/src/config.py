@@ -2,7 +2,9 @@
 Enhanced Configuration for Green Trap Analysis
 Focus: Turkey's green transition and inflation dynamics compared to peer countries
 """
+import functools
 import os
+import sys
 
 # ============================================================================
 # 1. COUNTRY SELECTION STRATEGY
@@ -31,37 +33,52 @@ ASIAN_EMERGING = ['IDN', 'MYS', 'THA', 'PHL', 'VNM']
 OTHER_COUNTRIES = ['USA', 'JPN', 'GBR', 'FRA', 'BRA', 'KOR', 'CHL', 'NZL']
 
 # Union of all (Turkey MUST be included)
-ALL_COUNTRIES = sorted(list(set(
-    TURKEY_PEERS_EMERGING + FAST_GROWING + GREEN_LEADERS +
-    ENERGY_DEPENDENT + SOUTHERN_EUROPE + ASIAN_EMERGING + OTHER_COUNTRIES
-)))
+ALL_COUNTRIES: tuple[str, ...] = tuple(map(sys.intern, sorted({
+    *TURKEY_PEERS_EMERGING, *FAST_GROWING, *GREEN_LEADERS,
+    *ENERGY_DEPENDENT, *SOUTHERN_EUROPE, *ASIAN_EMERGING, *OTHER_COUNTRIES
+})))
+
+_ALL_COUNTRIES_SET = frozenset(ALL_COUNTRIES)
+
+# Verify Turkey is included (explicit raise: survives `python -O`)
+if 'TUR' not in _ALL_COUNTRIES_SET:
+    raise RuntimeError("Turkey must be in the analysis!")
+
+# Hashed views of the group lists (O(1) membership checks)
+_GREEN_LEADERS_SET = frozenset(GREEN_LEADERS)
+_FAST_GROWING_SET = frozenset(FAST_GROWING)
+_ENERGY_DEPENDENT_SET = frozenset(ENERGY_DEPENDENT)
+_TURKEY_PEERS_EMERGING_SET = frozenset(TURKEY_PEERS_EMERGING)
+_SOUTHERN_EUROPE_SET = frozenset(SOUTHERN_EUROPE)
+_ASIAN_EMERGING_SET = frozenset(ASIAN_EMERGING)
+
+# Group priority: a country in several lists gets the first matching label
+_GROUP_PRIORITY = (
+    (_GREEN_LEADERS_SET, 'Green_Leaders'),
+    (_FAST_GROWING_SET, 'Fast_Growing'),
+    (_ENERGY_DEPENDENT_SET, 'Energy_Dependent'),
+    (_TURKEY_PEERS_EMERGING_SET, 'Turkey_Peers'),
+    (_SOUTHERN_EUROPE_SET, 'Southern_Europe'),
+    (_ASIAN_EMERGING_SET, 'Asian_Emerging'),
+)
+
+
+def _classify(country):
+    """Return the analytical group label for a country code."""
+    if country == 'TUR':
+        return 'Turkey_Focus'
+    for members, label in _GROUP_PRIORITY:
+        if country in members:
+            return label
+    return 'Other_Advanced'
 
-# Verify Turkey is included
-assert 'TUR' in ALL_COUNTRIES, "Turkey must be in the analysis!"
 
 # Map countries to analytical groups (for heterogeneity analysis)
-COUNTRY_GROUPS = {}
-for c in ALL_COUNTRIES:
-    if c == 'TUR':
-        COUNTRY_GROUPS[c] = 'Turkey_Focus'
-    elif c in GREEN_LEADERS:
-        COUNTRY_GROUPS[c] = 'Green_Leaders'
-    elif c in FAST_GROWING:
-        COUNTRY_GROUPS[c] = 'Fast_Growing'
-    elif c in ENERGY_DEPENDENT:
-        COUNTRY_GROUPS[c] = 'Energy_Dependent'
-    elif c in TURKEY_PEERS_EMERGING:
-        COUNTRY_GROUPS[c] = 'Turkey_Peers'
-    elif c in SOUTHERN_EUROPE:
-        COUNTRY_GROUPS[c] = 'Southern_Europe'
-    elif c in ASIAN_EMERGING:
-        COUNTRY_GROUPS[c] = 'Asian_Emerging'
-    else:
-        COUNTRY_GROUPS[c] = 'Other_Advanced'
+COUNTRY_GROUPS = {c: _classify(c) for c in ALL_COUNTRIES}
 
 # Energy importer/exporter classification (CRITICAL for Turkey analysis)
-ENERGY_IMPORTERS = ['TUR', 'DEU', 'ITA', 'ESP', 'JPN', 'KOR', 'IND', 'CHN', 'GRC', 'PRT', 'THA', 'PHL']
-ENERGY_EXPORTERS = ['RUS', 'SAU', 'NOR', 'CAN', 'AUS', 'MEX', 'IDN', 'MYS']
+ENERGY_IMPORTERS: frozenset[str] = frozenset({'TUR', 'DEU', 'ITA', 'ESP', 'JPN', 'KOR', 'IND', 'CHN', 'GRC', 'PRT', 'THA', 'PHL'})
+ENERGY_EXPORTERS: frozenset[str] = frozenset({'RUS', 'SAU', 'NOR', 'CAN', 'AUS', 'MEX', 'IDN', 'MYS'})
 
 # ============================================================================
 # 2. TIME PERIOD (with crisis markers)
@@ -177,56 +194,64 @@ WDI_VARIABLES = {
     'EP.PMP.SGAS.CD': 'Gasoline_Price_USD_Per_Liter',           # Gasoline price (energy proxy)
 }
 
+# Intern codes and names: dotted indicator codes are not interned by the
+# compiler, and every downstream rename/lookup keys on them
+WDI_VARIABLES = {sys.intern(code): sys.intern(name) for code, name in WDI_VARIABLES.items()}
+
+# Lookups in both directions (code -> name is the literal above)
+WDI_CODE_TO_NAME = WDI_VARIABLES
+WDI_NAME_TO_CODE = dict(zip(WDI_VARIABLES.values(), WDI_VARIABLES.keys()))
+
 # ============================================================================
 # 4. VARIABLE GROUPINGS (for analysis and feature engineering)
 # ============================================================================
 
 # Core green transition variables
-GREEN_VARS = [
+GREEN_VARS: tuple[str, ...] = (
     'Renewable_Energy_Consumption_Pct',
     'Renewable_Electricity_Output_Pct',
     'Renewable_Electricity_NoHydro_Pct',
     'Fossil_Fuel_Consumption_Pct',
     'Alternative_Nuclear_Energy_Pct'
-]
+)
 
 # Energy vulnerability (especially important for Turkey)
-ENERGY_VULNERABILITY_VARS = [
+ENERGY_VULNERABILITY_VARS: tuple[str, ...] = (
     'Energy_Imports_Net_Pct',
     'Fuel_Imports_Pct_Merchandise',
     'Energy_Intensity_Primary_MJ_Per_GDP',
     'Energy_Use_Per_GDP_PPP'
-]
+)
 
 # Inflation drivers (for model controls)
-INFLATION_CONTROLS = [
+INFLATION_CONTROLS: tuple[str, ...] = (
     'Broad_Money_Growth_Pct',
     'Real_Effective_Exchange_Rate_Index',
     'Energy_Imports_Net_Pct',
     'Current_Account_Balance_Pct_GDP',
     'Gov_Expenditure_Pct_GDP'
-]
+)
 
 # Carbon/emissions variables
-EMISSIONS_VARS = [
+EMISSIONS_VARS: tuple[str, ...] = (
     'Carbon_Intensity_CO2_Per_GDP',
     'CO2_Emissions_Per_Capita_Tons',
     'GHG_Emissions_Total_KtCO2e',
     'GHG_Emissions_Growth_Pct'
-]
+)
 
 # Variables that should NOT be interpolated (volatile, crisis-sensitive)
-NO_INTERPOLATE = [
+NO_INTERPOLATE: tuple[str, ...] = (
     'Inflation_CPI_Pct',
     'GDP_Growth_Pct',
     'Broad_Money_Growth_Pct',
     'GHG_Emissions_Growth_Pct',
     'GDP_Deflator_Growth_Pct',
     'Real_Interest_Rate_Pct'
-]
+)
 
 # Variables suitable for forward-fill (structural, slow-moving)
-FORWARD_FILL_OK = [
+FORWARD_FILL_OK: tuple[str, ...] = (
     'Renewable_Energy_Consumption_Pct',
     'Fossil_Fuel_Consumption_Pct',
     'Energy_Intensity_Primary_MJ_Per_GDP',
@@ -234,24 +259,78 @@ FORWARD_FILL_OK = [
     'Manufacturing_Value_Added_Pct_GDP',
     'Industry_Value_Added_Pct_GDP',  # ADDED
     'Urban_Population_Pct'  # ADDED
-]
+)
+
+# Hashed companions for membership checks (the tuples keep iteration order)
+NO_INTERPOLATE_SET = frozenset(NO_INTERPOLATE)
+FORWARD_FILL_OK_SET = frozenset(FORWARD_FILL_OK)
 
 # ============================================================================
 # 5. PATHS
 # ============================================================================
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
-RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
-PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')
+# Paths are resolved lazily (PEP 562): nothing touches the filesystem until a
+# path constant is first read, after which it is cached in the module globals.
+# Lookups never create directories; writers call ensure_dirs() first.
+# Each entry maps a constant to (parent constant, child name).
+_PATH_LAYOUT = {
+    'DATA_DIR': ('BASE_DIR', 'data'),
+    'RAW_DATA_DIR': ('DATA_DIR', 'raw'),
+    'PROCESSED_DATA_DIR': ('DATA_DIR', 'processed'),
+    'OUTPUTS_DIR': ('BASE_DIR', 'outputs'),
+    'FIGURES_DIR': ('OUTPUTS_DIR', 'figures'),
+    'MODELS_DIR': ('OUTPUTS_DIR', 'models'),
+
+    # File paths
+    'RAW_DATA_PATH': ('RAW_DATA_DIR', 'wb_raw.csv'),
+    'PROCESSED_DATA_PATH': ('PROCESSED_DATA_DIR', 'analysis_ready.csv'),
+    'PROCESSED_PARQUET_PATH': ('PROCESSED_DATA_DIR', 'analysis_ready.parquet'),
+    'TURKEY_COMPARISON_PATH': ('PROCESSED_DATA_DIR', 'turkey_vs_peers.csv'),
+    'DATA_QUALITY_REPORT_PATH': ('PROCESSED_DATA_DIR', 'data_quality_report.txt'),
+
+    # Cache for WB API: Feather dataset partitioned by Country_Code
+    'CACHE_DIR': ('RAW_DATA_DIR', 'wb_cache'),
+}
+
+# Directories created by ensure_dirs()
+_OUTPUT_DIRS = ('RAW_DATA_DIR', 'PROCESSED_DATA_DIR', 'FIGURES_DIR', 'MODELS_DIR')
+
+
+def _compute(name):
+    """Return a path constant, computing and caching it on first use."""
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    if name == 'BASE_DIR':
+        value = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    elif name in _PATH_LAYOUT:
+        parent, child = _PATH_LAYOUT[name]
+        value = os.path.join(_compute(parent), child)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
 
-# File paths
-RAW_DATA_PATH = os.path.join(RAW_DATA_DIR, 'wb_raw.csv')
-PROCESSED_DATA_PATH = os.path.join(PROCESSED_DATA_DIR, 'analysis_ready.csv')
-TURKEY_COMPARISON_PATH = os.path.join(PROCESSED_DATA_DIR, 'turkey_vs_peers.csv')
-DATA_QUALITY_REPORT_PATH = os.path.join(PROCESSED_DATA_DIR, 'data_quality_report.txt')
+@functools.lru_cache(maxsize=1)
+def _bootstrap():
+    """Create the data and output directories (once per process)."""
+    for name in _OUTPUT_DIRS:
+        os.makedirs(_compute(name), exist_ok=True)
+
+
+def __getattr__(name):
+    return _compute(name)
+
+
+def __dir__():
+    return sorted({*globals(), 'BASE_DIR', *_PATH_LAYOUT})
+
+
+def ensure_dirs():
+    """Create the data and output directories if they do not exist (once per process)."""
+    _bootstrap()
 
-# Cache for WB API
-CACHE_PATH = os.path.join(RAW_DATA_DIR, 'wb_cache.pkl')
 
 # ============================================================================
 # 6. ANALYSIS PARAMETERS
@@ -259,7 +338,12 @@ CACHE_PATH = os.path.join(RAW_DATA_DIR, 'wb_cache.pkl')
 
 # For clustering
 N_CLUSTERS_RANGE = range(3, 8)  # Test 3-7 clusters
-CLUSTERING_FEATURES = GREEN_VARS + ENERGY_VULNERABILITY_VARS + ['Inflation_CPI_Pct', 'GDP_Growth_Pct']
+CLUSTERING_FEATURES: tuple[str, ...] = (*GREEN_VARS, *ENERGY_VULNERABILITY_VARS, 'Inflation_CPI_Pct', 'GDP_Growth_Pct')
+
+# For feature engineering: pandas engine for the rolling volatility features.
+# 'numba' (requires numba) JIT-compiles once per process (several seconds),
+# so it only pays off on panels far larger than the default WDI pull.
+ROLLING_ENGINE = 'cython'
 
 # For Random Forest
 RF_PARAMS = {
@@ -283,7 +367,7 @@ PANEL_EFFECTS = {
 
 # Turkey-specific analysis flags
 FOCUS_ON_TURKEY = True
-TURKEY_PEER_COMPARISON_COUNTRIES = ['POL', 'MEX', 'ZAF', 'THA']  # Main comparisons
+TURKEY_PEER_COMPARISON_COUNTRIES = [c for c in TURKEY_PEERS_EMERGING if c != 'TUR']  # Main comparisons
 TURKEY_ADVANCED_COMPARISON = ['DEU', 'ITA']  # Aspirational comparisons
 
 # Hypothesis testing
@@ -299,7 +383,10 @@ MAX_MISSING_PCT_PER_VARIABLE = 0.30  # Drop variables missing >30%
 OUTLIER_THRESHOLD_INFLATION = 100  # Flag inflation > 100% as potential error
 OUTLIER_THRESHOLD_GDP_GROWTH = 20  # Flag GDP growth > |20%| as potential error
 
-print(f"✅ Configuration loaded successfully")
-print(f"📊 Total countries: {len(ALL_COUNTRIES)}")
-print(f"🔢 Total indicators: {len(WDI_VARIABLES)}")
-print(f"🇹🇷 Turkey comparison strategy: {len(TURKEY_PEER_COMPARISON_COUNTRIES)} peers + {len(TURKEY_ADVANCED_COMPARISON)} advanced")
\ No newline at end of file
+
+def describe() -> None:
+    """Print a short summary of the active configuration."""
+    print(f"✅ Configuration loaded successfully")
+    print(f"📊 Total countries: {len(ALL_COUNTRIES)}")
+    print(f"🔢 Total indicators: {len(WDI_VARIABLES)}")
+    print(f"🇹🇷 Turkey comparison strategy: {len(TURKEY_PEER_COMPARISON_COUNTRIES)} peers + {len(TURKEY_ADVANCED_COMPARISON)} advanced")
@@ -0,0 +1,196 @@
+"""
+Data quality checks for the wide WDI frame: validation and the written report
+Used by _wdi after a fresh fetch and re-exported by data_loader
+"""
+import pandas as pd
+import numpy as np
+from . import config
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _fmt_outliers(df, col, n=5):
+    """Formats the first `n` outlier rows as 'CCC YYYY: x.x%' strings."""
+    head = df.head(n)
+    return (
+        head['Country_Code'].astype(str) + ' ' + head['Year'].astype(str) + ': '
+        + head[col].map('{:.1f}'.format) + '%'
+    ).tolist()
+
+
+@dataclass
+class DataProfile:
+    """Column scans shared by validate_data and generate_data_quality_report."""
+    n_rows: int
+    tur_mask: np.ndarray
+    na_counts: pd.Series
+
+
+def profile_data(df):
+    """Computes the Turkey row mask and per-column missing counts once."""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    return DataProfile(
+        n_rows=len(df),
+        tur_mask=df['Country_Code'].to_numpy() == 'TUR',
+        na_counts=df[numeric_cols].isna().sum(),
+    )
+
+
+def validate_data(df, profile=None):
+    """
+    Comprehensive data quality checks.
+
+    Args:
+        df: Wide WDI frame
+        profile: Optional precomputed DataProfile for `df`
+
+    Returns:
+        bool: True if all checks pass
+    """
+    if profile is None:
+        profile = profile_data(df)
+    issues = []
+
+    # 1. Check Turkey is present
+    if not profile.tur_mask.any():
+        issues.append("🚨 CRITICAL: Turkey (TUR) not found in data!")
+    else:
+        turkey_years = np.unique(df['Year'].to_numpy()[profile.tur_mask]).size
+        logger.info("   🇹🇷 Turkey: %d years of data", turkey_years)
+        if turkey_years < config.MIN_OBSERVATIONS_PER_COUNTRY:
+            issues.append(f"⚠️ Turkey has only {turkey_years} years (min: {config.MIN_OBSERVATIONS_PER_COUNTRY})")
+
+    # 2. Check all target countries
+    missing_countries = set(config.ALL_COUNTRIES) - set(df['Country_Code'].unique())
+    if missing_countries:
+        issues.append(f"⚠️ Missing countries: {missing_countries}")
+
+    # 3. Check year range
+    year_min, year_max = df['Year'].min(), df['Year'].max()
+    if year_min > config.START_YEAR or year_max < config.END_YEAR:
+        issues.append(f"⚠️ Year range {year_min}-{year_max} doesn't match config {config.START_YEAR}-{config.END_YEAR}")
+
+    # 4. Check for duplicate rows
+    dupes = df.duplicated(subset=['Country_Code', 'Year'])
+    if dupes.any():
+        issues.append(f"❌ CRITICAL: {dupes.sum()} duplicate country-year rows!")
+
+    # 5. Check outcome variables exist and have data
+    outcome_vars = ['Inflation_CPI_Pct', 'GDP_Growth_Pct']
+    for var in outcome_vars:
+        if var not in df.columns:
+            issues.append(f"❌ CRITICAL: Outcome variable '{var}' not found!")
+        else:
+            missing_pct = profile.na_counts[var] / profile.n_rows * 100
+            logger.info("   %s: %.1f%% missing", var, missing_pct)
+            if missing_pct > config.MAX_MISSING_PCT_PER_VARIABLE * 100:
+                issues.append(
+                    f"⚠️ {var} missing {missing_pct:.1f}% (threshold: {config.MAX_MISSING_PCT_PER_VARIABLE * 100}%)")
+
+    # 6. Check for inflation outliers (potential data errors)
+    if 'Inflation_CPI_Pct' in df.columns:
+        outliers = df[df['Inflation_CPI_Pct'].abs() > config.OUTLIER_THRESHOLD_INFLATION]
+        if not outliers.empty:
+            logger.warning("   ⚠️ %d inflation outliers (>100%%):", len(outliers))
+            for line in _fmt_outliers(outliers, 'Inflation_CPI_Pct'):
+                logger.warning("      %s", line)
+
+    # 7. Check for GDP growth outliers
+    if 'GDP_Growth_Pct' in df.columns:
+        outliers = df[df['GDP_Growth_Pct'].abs() > config.OUTLIER_THRESHOLD_GDP_GROWTH]
+        if not outliers.empty:
+            logger.warning("   ⚠️ %d GDP growth outliers (>|20%%|):", len(outliers))
+            for line in _fmt_outliers(outliers, 'GDP_Growth_Pct'):
+                logger.warning("      %s", line)
+
+    # 8. Check green variables coverage
+    green_vars_in_df = [v for v in config.GREEN_VARS if v in df.columns]
+    logger.info("   Green variables: %d/%d present", len(green_vars_in_df), len(config.GREEN_VARS))
+
+    # Report issues
+    if issues:
+        logger.warning("\n⚠️ DATA QUALITY ISSUES:")
+        for issue in issues:
+            logger.warning("   %s", issue)
+        return False
+    else:
+        logger.info("   ✅ All validation checks passed!")
+        return True
+
+
+def generate_data_quality_report(df, profile=None):
+    """
+    Creates a detailed data quality report.
+
+    The report is streamed straight to DATA_QUALITY_REPORT_PATH.
+
+    Args:
+        df: Wide WDI frame
+        profile: Optional precomputed DataProfile for `df`
+
+    Returns:
+        str: Path of the written report
+    """
+    if profile is None:
+        profile = profile_data(df)
+
+    config.ensure_dirs()
+    with open(config.DATA_QUALITY_REPORT_PATH, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        w = f.write
+        w("=" * 70 + "\n")
+        w("DATA QUALITY REPORT - GREEN TRAP ANALYSIS\n")
+        w("=" * 70 + "\n")
+        w(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        w(f"\nDataset shape: {df.shape[0]} rows × {df.shape[1]} columns\n")
+        w(f"Countries: {df['Country_Code'].nunique()}\n")
+        w(f"Years: {df['Year'].min()} - {df['Year'].max()}\n")
+
+        # Turkey-specific section
+        w("\n" + "=" * 70 + "\n")
+        w("🇹🇷 TURKEY DATA QUALITY\n")
+        w("=" * 70 + "\n")
+        turkey_df = df[profile.tur_mask]
+        if not turkey_df.empty:
+            w(f"Observations: {len(turkey_df)}\n")
+            w(f"Year range: {turkey_df['Year'].min()} - {turkey_df['Year'].max()}\n")
+
+            # Key variables for Turkey
+            key_vars = ['Inflation_CPI_Pct', 'GDP_Growth_Pct', 'Renewable_Energy_Consumption_Pct',
+                        'Energy_Imports_Net_Pct', 'Current_Account_Balance_Pct_GDP']
+            w("\nKey variables (% non-missing):\n")
+            for var in key_vars:
+                if var in turkey_df.columns:
+                    non_missing = (1 - turkey_df[var].isna().sum() / len(turkey_df)) * 100
+                    w(f"  {var:45s}: {non_missing:5.1f}%\n")
+        else:
+            w("❌ NO TURKEY DATA FOUND!\n")
+
+        # Overall missingness
+        w("\n" + "=" * 70 + "\n")
+        w("MISSING DATA SUMMARY (All countries)\n")
+        w("=" * 70 + "\n")
+        missing_summary = profile.na_counts.sort_values(ascending=False)
+        missing_pct = (missing_summary / profile.n_rows * 100).round(1)
+
+        w("\nTop 20 variables with missing data:\n")
+        for var, pct in missing_pct.head(20).items():
+            count = missing_summary[var]
+            w(f"  {var:45s}: {pct:5.1f}% ({count:6d} obs)\n")
+
+        # Country coverage
+        w("\n" + "=" * 70 + "\n")
+        w("COUNTRY COVERAGE\n")
+        w("=" * 70 + "\n")
+        # Categorical codes count every configured country; list observed ones only
+        country_obs = df['Country_Code'].value_counts()[lambda s: s > 0]
+        w(f"\nObservations per country (top 15):\n")
+        for country, obs in country_obs.head(15).items():
+            group = config.COUNTRY_GROUPS.get(country, 'Unknown')
+            w(f"  {country} ({group:20s}): {obs:3d} years\n")
+
+    logger.info("\n📋 Data quality report saved to: %s", config.DATA_QUALITY_REPORT_PATH)
+
+    return config.DATA_QUALITY_REPORT_PATH
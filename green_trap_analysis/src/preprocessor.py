@@ -5,15 +5,65 @@ Focus: Turkey-centric feature engineering with careful handling of missing data
 import pandas as pd
 import numpy as np
 from . import config
+from ._io import write_csv
+import functools
 import os
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Outcome variables: rows missing these are dropped, and they stay float64
+# (volatility and outlier thresholds are computed on them)
+_OUTCOME_VARS = ('Inflation_CPI_Pct', 'GDP_Growth_Pct')
+
+# Per-country window features: feature name -> source column
+_DIFF_FEATURES = {
+    'Green_Transition_Speed': 'Renewable_Energy_Consumption_Pct',
+    'Modern_Renewables_Growth': 'Renewable_Electricity_NoHydro_Pct',
+    'Fossil_Reduction_Rate': 'Fossil_Fuel_Consumption_Pct',
+    'REER_Change': 'Real_Effective_Exchange_Rate_Index',
+}
+_VOLATILITY_FEATURES = {
+    'Inflation_Volatility_3Y': 'Inflation_CPI_Pct',
+    'GDP_Growth_Volatility_3Y': 'GDP_Growth_Pct',
+}
+_PCT_CHANGE_FEATURES = {
+    'Emissions_Reduction_Rate': 'CO2_Emissions_Per_Capita_Tons',
+}
+# numba (optional) costs ~140 ms to import and ~120 ms to load its cached
+# kernel per process; measured on a 27-column panel, the compiled kernel
+# only wins that back from about this many rows
+_NUMBA_MIN_ROWS = 500_000
+
+# polars (optional) costs ~100 ms to import per process; the Polars window
+# query only wins that back from about this many rows
+_POLARS_MIN_ROWS = 150_000
+
+# Crisis/transition periods over 2000-2024: each period's first year after
+# Pre_Crisis (the pd.cut bins 1999, 2007, 2009, 2019, 2021, 2024)
+_PERIOD_FIRST_YEARS = np.array([2008, 2010, 2020, 2022])
+_PERIOD_YEARS = (2000, 2024)
+_PERIOD_DTYPE = pd.CategoricalDtype(
+    ['Pre_Crisis', 'Financial_Crisis', 'Recovery_Green', 'Pandemic', 'Energy_Crisis'],
+    ordered=True
+)
+
+_LAG_VARS = (
+    'Renewable_Energy_Consumption_Pct',
+    'Energy_Imports_Net_Pct',
+    'Broad_Money_Growth_Pct',
+    'Green_Transition_Speed'
+)
+
 
 def load_raw_data():
-    """Load raw data with validation."""
+    """
+    Load raw data with validation.
+
+    Rows come back sorted by Country_Code and Year with a fresh RangeIndex;
+    every later step relies on that order instead of re-sorting.
+    """
     if not os.path.exists(config.RAW_DATA_PATH):
         raise FileNotFoundError(
             f"❌ Raw data not found at {config.RAW_DATA_PATH}\n"
@@ -21,23 +71,144 @@ def load_raw_data():
         )
 
     logger.info(f"📂 Loading raw data from: {config.RAW_DATA_PATH}")
-    df = pd.read_csv(config.RAW_DATA_PATH)
+    df = pd.read_csv(config.RAW_DATA_PATH, engine='pyarrow')
+    df = df.sort_values(['Country_Code', 'Year'], kind='mergesort', ignore_index=True)
+
+    # The pyarrow CSV writer prints integral floats without '.0', so a
+    # gap-free indicator such as Population_Total reads back as int64
+    int_cols = df.select_dtypes(include=['integer']).columns.difference(['Year'])
+    df[int_cols] = df[int_cols].astype(np.float64)
+
+    # Indicators carry a few significant digits: float32 halves the memory
+    # every groupby/diff/rolling pass moves
+    float_cols = df.select_dtypes(include=['float64']).columns.difference(_OUTCOME_VARS)
+    df[float_cols] = df[float_cols].astype(np.float32)
+    df['Country_Code'] = df['Country_Code'].astype('category')
+
     logger.info(f"   Shape: {df.shape}")
     return df
 
 
+def _country_bounds(codes):
+    """
+    Start/stop row offsets of each country block in a frame sorted by country.
+
+    Args:
+        codes: Country_Code values in row order
+
+    Returns:
+        tuple: (starts, stops) integer arrays, one entry per country
+    """
+    starts = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    return np.r_[0, starts], np.r_[starts, len(codes)]
+
+
+def _interp_inside(values, starts, stops, limit):
+    """
+    Linear interpolation of interior NaN runs, in place, per country block.
+
+    Matches pandas' interpolate(method='linear', limit=limit,
+    limit_area='inside') on each block: only NaNs with a valid value on
+    both sides are filled, at most `limit` per run, counting forward.
+
+    Args:
+        values: (rows, columns) float array, sorted by country
+        starts, stops: Row offsets of each country block (_country_bounds)
+        limit: Maximum number of consecutive NaNs to fill
+    """
+    n = len(values)
+    rows = np.arange(n)[:, None]
+    valid = ~np.isnan(values)
+    # Previous and next valid row of every cell, column by column
+    prev = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    nxt = np.minimum.accumulate(np.where(valid, rows, n)[::-1], axis=0)[::-1]
+    lens = stops - starts
+    block_start = np.repeat(starts, lens)[:, None]
+    block_stop = np.repeat(stops, lens)[:, None]
+
+    fill = ~valid & (prev >= block_start) & (nxt < block_stop) & (rows - prev <= limit)
+    i, k = np.nonzero(fill)
+    last, following = prev[i, k], nxt[i, k]
+    # Same arithmetic as np.interp, in float64
+    y0 = values[last, k].astype(np.float64)
+    slope = (values[following, k].astype(np.float64) - y0) / (following - last)
+    values[i, k] = slope * (i - last) + y0
+
+
+def _interp_inside_loop(values, starts, stops, limit):
+    """Scalar-loop form of _interp_inside(), compiled by _interp_kernel()."""
+    for g in range(len(starts)):
+        for k in range(values.shape[1]):
+            last = -1  # row of the previous valid value in this block
+            for i in range(starts[g], stops[g]):
+                if np.isnan(values[i, k]):
+                    continue
+                if last >= 0 and i - last > 1:
+                    y0 = np.float64(values[last, k])
+                    slope = (np.float64(values[i, k]) - y0) / (i - last)
+                    for j in range(last + 1, min(i, last + 1 + limit)):
+                        values[j, k] = slope * (j - last) + y0
+                last = i
+
+
+@functools.lru_cache(maxsize=None)
+def _interp_kernel():
+    """_interp_inside_loop compiled with numba, or None if numba is missing."""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    # cache=True keeps the compiled kernel on disk across runs
+    return njit(cache=True, nogil=True)(_interp_inside_loop)
+
+
+def _fill_gaps(df, ff_vars, interpolate_vars):
+    """
+    Fills gaps per country, in place: forward fill (limit 3) of `ff_vars`,
+    interior linear interpolation (limit 2) of `interpolate_vars`, then a
+    backward fill (limit 1) of both.
+
+    `df` must be sorted by Country_Code and Year.
+    """
+    fill_vars = ff_vars + interpolate_vars
+    if not fill_vars:
+        return
+    df[ff_vars] = df.groupby('Country_Code', sort=False, observed=True)[ff_vars].ffill(limit=3)
+
+    # Rows are sorted by country, so each country is a contiguous block of
+    # the value matrix, interpolated in one pass over all columns
+    if interpolate_vars:
+        # Explicit copy: under copy-on-write to_numpy() may hand back a
+        # read-only view of a single-block frame
+        values = df[interpolate_vars].to_numpy(copy=True)
+        starts, stops = _country_bounds(df['Country_Code'].to_numpy())
+        kernel = _interp_kernel() if len(values) >= _NUMBA_MIN_ROWS else None
+        (kernel or _interp_inside)(values, starts, stops, 2)
+        dtypes = df[interpolate_vars].dtypes
+        if (dtypes == values.dtype).all():
+            df[interpolate_vars] = values
+        else:
+            # Mixed float32/float64 columns shared one float64 matrix: cast back
+            df[interpolate_vars] = pd.DataFrame(
+                values, index=df.index, columns=interpolate_vars
+            ).astype(dtypes.to_dict())
+
+    df[fill_vars] = df.groupby('Country_Code', sort=False, observed=True)[fill_vars].bfill(limit=1)
+
+
 def smart_imputation(df):
     """
     Intelligent missing data handling:
     - NO interpolation for volatile variables (inflation, growth)
     - Forward-fill for structural variables
     - Keep NaN where appropriate
+
+    Expects `df` sorted by Country_Code and Year (as from load_raw_data);
+    columns are filled in place.
     """
     logger.info("\n🔧 SMART IMPUTATION")
     logger.info("=" * 60)
 
-    df = df.sort_values(['Country_Code', 'Year']).copy()
-
     # Get numeric columns
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
 
@@ -50,9 +221,6 @@ def smart_imputation(df):
     ff_vars = [v for v in config.FORWARD_FILL_OK if v in df.columns]
     logger.info(f"   Variables: {len(ff_vars)}")
 
-    for var in ff_vars:
-        df[var] = df.groupby('Country_Code')[var].ffill(limit=3)
-
     # 2. NO IMPUTATION for volatile variables (preserve NaN)
     logger.info("\n2️⃣ Preserving NaN for volatile variables...")
     no_imp_vars = [v for v in config.NO_INTERPOLATE if v in df.columns]
@@ -63,21 +231,16 @@ def smart_imputation(df):
     logger.info("\n3️⃣ Interpolating energy/emissions variables...")
     interpolate_vars = [
         v for v in numeric_cols
-        if v not in config.NO_INTERPOLATE
-           and v not in config.FORWARD_FILL_OK
+        if v not in config.NO_INTERPOLATE_SET
+           and v not in config.FORWARD_FILL_OK_SET
            and v not in ['Country_Code', 'Year']
     ]
     logger.info(f"   Variables: {len(interpolate_vars)}")
 
-    for var in interpolate_vars:
-        if var in df.columns:
-            df[var] = df.groupby('Country_Code')[var].transform(
-                lambda x: x.interpolate(method='linear', limit=2, limit_area='inside')
-            )
-
     # 4. Backward fill for edge cases (start of series)
     logger.info("\n4️⃣ Backward filling edge cases...")
-    df[ff_vars + interpolate_vars] = df.groupby('Country_Code')[ff_vars + interpolate_vars].bfill(limit=1)
+    # Steps 1, 3 and 4 run together, see _fill_gaps()
+    _fill_gaps(df, ff_vars, interpolate_vars)
 
     missing_after = df[numeric_cols].isna().sum().sum()
     logger.info(f"\n✅ Missing values after imputation: {missing_after:,}")
@@ -85,8 +248,7 @@ def smart_imputation(df):
         f"   Reduced by: {missing_before - missing_after:,} ({(1 - missing_after / missing_before) * 100:.1f}%)")
 
     # 5. CRITICAL: Drop rows where outcome variables are missing
-    outcome_vars = ['Inflation_CPI_Pct', 'GDP_Growth_Pct']
-    existing_outcomes = [v for v in outcome_vars if v in df.columns]
+    existing_outcomes = [v for v in _OUTCOME_VARS if v in df.columns]
 
     if existing_outcomes:
         rows_before = len(df)
@@ -98,15 +260,189 @@ def smart_imputation(df):
     return df
 
 
+def _present(features, columns):
+    """Subset of a feature -> source map whose source column exists."""
+    return {name: src for name, src in features.items() if src in columns}
+
+
+def _block_lags(frame, codes, lags):
+    """
+    Per-country lags of every column of `frame` as plain array shifts.
+
+    On rows sorted by country, lag k is the whole matrix shifted down k
+    rows, blanked wherever the row is fewer than k rows into its block.
+
+    Args:
+        frame: Columns to lag, rows sorted by Country_Code and Year
+        codes: Country_Code values in row order
+        lags: Lag orders, e.g. (1, 2)
+
+    Returns:
+        list: One pd.DataFrame per lag order, columns suffixed '_Lag{k}'
+    """
+    starts, stops = _country_bounds(codes)
+    # Row offset within its country block
+    pos = np.arange(len(codes)) - np.repeat(starts, stops - starts)
+    values = frame.to_numpy(dtype=np.float64)
+    out = []
+    for k in lags:
+        shifted = np.full_like(values, np.nan)
+        shifted[k:] = values[:-k]
+        shifted[pos < k] = np.nan
+        out.append(
+            pd.DataFrame(shifted, index=frame.index, columns=frame.columns)
+            .astype(frame.dtypes.to_dict())
+            .add_suffix(f'_Lag{k}')
+        )
+    return out
+
+
+def _window_features_pandas(df):
+    """pandas groupby fallback for _window_features()."""
+    # One GroupBy for every per-country block transform
+    gb = df.groupby('Country_Code', sort=False, observed=True)
+    diffs = _present(_DIFF_FEATURES, df.columns)
+    diff_frame = gb[list(diffs.values())].diff().set_axis(list(diffs), axis=1)
+    parts = [diff_frame]
+
+    vols = _present(_VOLATILITY_FEATURES, df.columns)
+    if vols:
+        # Grouped rolling window: no per-country Python lambda. The numba
+        # engine keys rows by the original index only, the Cython engine
+        # also by country, so keep the last level either way
+        vol = gb[list(vols.values())].rolling(3, min_periods=2).std(engine=config.ROLLING_ENGINE)
+        vol.index = vol.index.get_level_values(-1)
+        parts.append(vol.reindex(df.index).set_axis(list(vols), axis=1))
+
+    pcts = _present(_PCT_CHANGE_FEATURES, df.columns)
+    if pcts:
+        # No forward fill across gaps (pandas 2.x's default), same as the polars path
+        parts.append(gb[list(pcts.values())].pct_change(fill_method=None).set_axis(list(pcts), axis=1))
+
+    if 'Carbon_Intensity_CO2_Per_GDP' in df.columns:
+        # ~25 per-year minima, mapped back onto the rows
+        year_min = df.groupby('Year', sort=False)['Carbon_Intensity_CO2_Per_GDP'].min()
+        parts.append(df['Year'].map(year_min).rename('Carbon_Efficiency_Frontier').to_frame())
+
+    # Lags may read features computed above (Green_Transition_Speed)
+    lag_src = pd.concat([df[[v for v in _LAG_VARS if v in df.columns]], diff_frame], axis=1)
+    lag_src = lag_src[[v for v in _LAG_VARS if v in lag_src.columns]]
+    parts.extend(_block_lags(lag_src, df['Country_Code'].to_numpy(), (1, 2)))
+
+    return pd.concat(parts, axis=1)
+
+
+@functools.lru_cache(maxsize=None)
+def _polars_available():
+    """True if polars >= 1.21 (for rolling_std(min_samples=...)) is installed."""
+    try:
+        import polars as pl
+    except ImportError:
+        return False
+    return tuple(int(p) for p in pl.__version__.split('.')[:2]) >= (1, 21)
+
+
+def _window_features_polars(df):
+    """Polars lazy-query implementation of _window_features()."""
+    import polars as pl
+
+    diffs = _present(_DIFF_FEATURES, df.columns)
+    vols = _present(_VOLATILITY_FEATURES, df.columns)
+    pcts = _present(_PCT_CHANGE_FEATURES, df.columns)
+    frontier = 'Carbon_Intensity_CO2_Per_GDP' in df.columns
+    sources = {*diffs.values(), *vols.values(), *pcts.values(),
+               *(v for v in _LAG_VARS if v in df.columns)}
+    if frontier:
+        sources.add('Carbon_Intensity_CO2_Per_GDP')
+
+    lf = pl.from_pandas(df[['Country_Code', 'Year', *sorted(sources)]]).lazy()
+    lf = lf.with_columns(
+        *[pl.col(src).diff().over('Country_Code').alias(name) for name, src in diffs.items()],
+        *[pl.col(src).rolling_std(3, min_samples=2).over('Country_Code').alias(name)
+          for name, src in vols.items()],
+        # x / x[-1] - 1 without filling gaps, like pandas pct_change(fill_method=None)
+        *[(pl.col(src) / pl.col(src).shift(1) - 1).over('Country_Code').alias(name)
+          for name, src in pcts.items()],
+        *([pl.col('Carbon_Intensity_CO2_Per_GDP').min().over('Year').alias('Carbon_Efficiency_Frontier')]
+          if frontier else []),
+    )
+    # Second stage so lags can read features computed above (Green_Transition_Speed)
+    lags = [v for v in _LAG_VARS if v in sources or v in diffs]
+    lf = lf.with_columns(
+        *[pl.col(v).shift(k).over('Country_Code').alias(f'{v}_Lag{k}') for v in lags for k in (1, 2)]
+    )
+
+    names = [*diffs, *vols, *pcts, *(['Carbon_Efficiency_Frontier'] if frontier else []),
+             *(f'{v}_Lag{k}' for v in lags for k in (1, 2))]
+    out = lf.select(names).collect().to_pandas()
+    out.index = df.index
+    return out
+
+
+def _window_features(df):
+    """
+    Computes the per-country diff, rolling-volatility, pct-change and lag
+    features, plus the per-year carbon frontier.
+
+    Large panels (_POLARS_MIN_ROWS and up) use a single lazy Polars query
+    when polars is installed, everything else pandas groupby. `df` must be
+    sorted by Country_Code and Year.
+
+    Returns:
+        pd.DataFrame: One column per computable feature, aligned with `df`
+    """
+    if len(df) >= _POLARS_MIN_ROWS and _polars_available():
+        return _window_features_polars(df)
+    return _window_features_pandas(df)
+
+
+def _country_flags(codes):
+    """
+    Country classification columns, evaluated once per distinct country.
+
+    Args:
+        codes: Categorical Country_Code series
+
+    Returns:
+        pd.DataFrame: Flag columns, one row per category of `codes`
+    """
+    countries = codes.cat.categories
+    flags = pd.DataFrame(index=countries)
+    flags['Is_Energy_Importer'] = countries.isin(config.ENERGY_IMPORTERS).astype(np.int8)
+    flags['Country_Group'] = countries.map(config.COUNTRY_GROUPS)
+    flags['Is_Turkey'] = (countries == 'TUR').astype(np.int8)
+    flags['Is_Green_Leader'] = countries.isin(config.GREEN_LEADERS).astype(np.int8)
+    flags['Is_Turkey_Peer'] = countries.isin(config.TURKEY_PEERS_EMERGING).astype(np.int8)
+    return flags
+
+
 def create_derived_features(df):
     """
     Feature engineering focused on green transition dynamics.
+
+    Expects `df` sorted by Country_Code and Year (as from load_raw_data);
+    feature columns are added in place.
     """
     logger.info("\n🔨 FEATURE ENGINEERING")
     logger.info("=" * 60)
 
-    # Sort for time-based operations
-    df = df.sort_values(['Country_Code', 'Year']).copy()
+    # Column snapshot for the existence checks below; features that later
+    # steps read are added to it as they are created
+    cols = set(df.columns)
+
+    # Grouped diff/shift/rolling features in one pass
+    win = _window_features(df)
+
+    # Country classifications: gather the per-country flag table by
+    # integer category code, no string hashing per row
+    codes = df['Country_Code'].astype('category')
+    country_idx = codes.cat.codes.to_numpy()
+    flags = _country_flags(codes).take(country_idx).set_axis(df.index)
+    # Missing country (code -1): take() wrapped to the last country's row
+    unknown = country_idx == -1
+    if unknown.any():
+        flags.loc[unknown, flags.columns.difference(['Country_Group'])] = 0
+        flags.loc[unknown, 'Country_Group'] = np.nan
 
     # ========================================================================
     # 1. GREEN TRANSITION DYNAMICS
@@ -114,18 +450,19 @@ def create_derived_features(df):
     logger.info("\n1️⃣ Green transition dynamics...")
 
     # Transition speed (year-over-year change in renewable share)
-    if 'Renewable_Energy_Consumption_Pct' in df.columns:
-        df['Green_Transition_Speed'] = df.groupby('Country_Code')['Renewable_Energy_Consumption_Pct'].diff()
+    if 'Renewable_Energy_Consumption_Pct' in cols:
+        df['Green_Transition_Speed'] = win['Green_Transition_Speed']
+        cols.add('Green_Transition_Speed')
         logger.info("   ✅ Green_Transition_Speed")
 
     # Modern renewables growth (excluding hydro - key for "new" transition)
-    if 'Renewable_Electricity_NoHydro_Pct' in df.columns:
-        df['Modern_Renewables_Growth'] = df.groupby('Country_Code')['Renewable_Electricity_NoHydro_Pct'].diff()
+    if 'Renewable_Electricity_NoHydro_Pct' in cols:
+        df['Modern_Renewables_Growth'] = win['Modern_Renewables_Growth']
         logger.info("   ✅ Modern_Renewables_Growth")
 
     # Fossil fuel reduction rate
-    if 'Fossil_Fuel_Consumption_Pct' in df.columns:
-        df['Fossil_Reduction_Rate'] = df.groupby('Country_Code')['Fossil_Fuel_Consumption_Pct'].diff()
+    if 'Fossil_Fuel_Consumption_Pct' in cols:
+        df['Fossil_Reduction_Rate'] = win['Fossil_Reduction_Rate']
         logger.info("   ✅ Fossil_Reduction_Rate")
 
     # ========================================================================
@@ -134,21 +471,22 @@ def create_derived_features(df):
     logger.info("\n2️⃣ Energy vulnerability indicators...")
 
     # Energy import dependence × energy intensity = vulnerability
-    if 'Energy_Imports_Net_Pct' in df.columns and 'Energy_Intensity_Primary_MJ_Per_GDP' in df.columns:
+    if 'Energy_Imports_Net_Pct' in cols and 'Energy_Intensity_Primary_MJ_Per_GDP' in cols:
         df['Energy_Vulnerability_Index'] = (
                 df['Energy_Imports_Net_Pct'] * df['Energy_Intensity_Primary_MJ_Per_GDP'] / 100
         )
         logger.info("   ✅ Energy_Vulnerability_Index")
 
     # Fuel import exposure (share of trade)
-    if 'Fuel_Imports_Pct_Merchandise' in df.columns and 'Trade_Pct_GDP' in df.columns:
+    if 'Fuel_Imports_Pct_Merchandise' in cols and 'Trade_Pct_GDP' in cols:
         df['Fuel_Import_Exposure'] = (
                 df['Fuel_Imports_Pct_Merchandise'] * df['Trade_Pct_GDP'] / 100
         )
         logger.info("   ✅ Fuel_Import_Exposure")
 
     # Energy importer dummy (Turkey is a major importer!)
-    df['Is_Energy_Importer'] = df['Country_Code'].isin(config.ENERGY_IMPORTERS).astype(int)
+    df['Is_Energy_Importer'] = flags['Is_Energy_Importer']
+    cols.add('Is_Energy_Importer')
     logger.info("   ✅ Is_Energy_Importer")
 
     # ========================================================================
@@ -157,33 +495,28 @@ def create_derived_features(df):
     logger.info("\n3️⃣ Macroeconomic indicators...")
 
     # Log transformations (for skewed distributions)
-    if 'GDP_Per_Capita_PPP' in df.columns:
+    if 'GDP_Per_Capita_PPP' in cols:
         df['Log_GDP_Per_Capita'] = np.log1p(df['GDP_Per_Capita_PPP'])
+        cols.add('Log_GDP_Per_Capita')
         logger.info("   ✅ Log_GDP_Per_Capita")
 
     # Inflation volatility (rolling std over 3 years)
-    if 'Inflation_CPI_Pct' in df.columns:
-        df['Inflation_Volatility_3Y'] = (
-            df.groupby('Country_Code')['Inflation_CPI_Pct']
-            .transform(lambda x: x.rolling(3, min_periods=2).std())
-        )
+    if 'Inflation_CPI_Pct' in cols:
+        df['Inflation_Volatility_3Y'] = win['Inflation_Volatility_3Y']
         logger.info("   ✅ Inflation_Volatility_3Y")
 
     # GDP growth volatility
-    if 'GDP_Growth_Pct' in df.columns:
-        df['GDP_Growth_Volatility_3Y'] = (
-            df.groupby('Country_Code')['GDP_Growth_Pct']
-            .transform(lambda x: x.rolling(3, min_periods=2).std())
-        )
+    if 'GDP_Growth_Pct' in cols:
+        df['GDP_Growth_Volatility_3Y'] = win['GDP_Growth_Volatility_3Y']
         logger.info("   ✅ GDP_Growth_Volatility_3Y")
 
     # Real exchange rate change (competitiveness shock)
-    if 'Real_Effective_Exchange_Rate_Index' in df.columns:
-        df['REER_Change'] = df.groupby('Country_Code')['Real_Effective_Exchange_Rate_Index'].diff()
+    if 'Real_Effective_Exchange_Rate_Index' in cols:
+        df['REER_Change'] = win['REER_Change']
         logger.info("   ✅ REER_Change")
 
     # Current account pressure (deficit/surplus relative to GDP)
-    if 'Current_Account_Balance_Pct_GDP' in df.columns:
+    if 'Current_Account_Balance_Pct_GDP' in cols:
         df['CA_Deficit_Dummy'] = (df['Current_Account_Balance_Pct_GDP'] < -3).astype(int)
         logger.info("   ✅ CA_Deficit_Dummy (>3% deficit)")
 
@@ -192,17 +525,10 @@ def create_derived_features(df):
     # ========================================================================
     logger.info("\n4️⃣ Creating lagged variables...")
 
-    lag_vars = [
-        'Renewable_Energy_Consumption_Pct',
-        'Energy_Imports_Net_Pct',
-        'Broad_Money_Growth_Pct',
-        'Green_Transition_Speed'
-    ]
-
-    for var in lag_vars:
-        if var in df.columns:
-            df[f'{var}_Lag1'] = df.groupby('Country_Code')[var].shift(1)
-            df[f'{var}_Lag2'] = df.groupby('Country_Code')[var].shift(2)
+    for var in _LAG_VARS:
+        if var in cols:
+            df[f'{var}_Lag1'] = win[f'{var}_Lag1']
+            df[f'{var}_Lag2'] = win[f'{var}_Lag2']
             logger.info(f"   ✅ {var}_Lag1, _Lag2")
 
     # ========================================================================
@@ -211,14 +537,16 @@ def create_derived_features(df):
     logger.info("\n5️⃣ Carbon efficiency metrics...")
 
     # Distance from carbon efficiency frontier (within each year)
-    if 'Carbon_Intensity_CO2_Per_GDP' in df.columns:
-        df['Carbon_Efficiency_Frontier'] = df.groupby('Year')['Carbon_Intensity_CO2_Per_GDP'].transform('min')
-        df['Carbon_Efficiency_Gap'] = df['Carbon_Intensity_CO2_Per_GDP'] / df['Carbon_Efficiency_Frontier']
+    if 'Carbon_Intensity_CO2_Per_GDP' in cols:
+        df['Carbon_Efficiency_Frontier'] = win['Carbon_Efficiency_Frontier']
+        df['Carbon_Efficiency_Gap'] = (
+                df['Carbon_Intensity_CO2_Per_GDP'].to_numpy() / df['Carbon_Efficiency_Frontier'].to_numpy()
+        )
         logger.info("   ✅ Carbon_Efficiency_Gap")
 
     # Emissions reduction rate
-    if 'CO2_Emissions_Per_Capita_Tons' in df.columns:
-        df['Emissions_Reduction_Rate'] = df.groupby('Country_Code')['CO2_Emissions_Per_Capita_Tons'].pct_change()
+    if 'CO2_Emissions_Per_Capita_Tons' in cols:
+        df['Emissions_Reduction_Rate'] = win['Emissions_Reduction_Rate']
         logger.info("   ✅ Emissions_Reduction_Rate")
 
     # ========================================================================
@@ -226,15 +554,15 @@ def create_derived_features(df):
     # ========================================================================
     logger.info("\n6️⃣ Creating period indicators...")
 
-    df['Period'] = pd.cut(
-        df['Year'],
-        bins=[1999, 2007, 2009, 2019, 2021, 2024],
-        labels=['Pre_Crisis', 'Financial_Crisis', 'Recovery_Green', 'Pandemic', 'Energy_Crisis']
-    )
+    years = df['Year'].to_numpy()
+    period_codes = np.searchsorted(_PERIOD_FIRST_YEARS, years, side='right')
+    in_range = (years >= _PERIOD_YEARS[0]) & (years <= _PERIOD_YEARS[1])
+    df['Period'] = pd.Categorical.from_codes(np.where(in_range, period_codes, -1), dtype=_PERIOD_DTYPE)
     logger.info("   ✅ Period (5 crisis/transition periods)")
 
     # Post-2020 dummy (energy crisis + high inflation era)
-    df['Post_2020'] = (df['Year'] >= 2020).astype(int)
+    df['Post_2020'] = (years >= 2020).astype(np.int8)
+    cols.add('Post_2020')
     logger.info("   ✅ Post_2020")
 
     # ========================================================================
@@ -242,10 +570,8 @@ def create_derived_features(df):
     # ========================================================================
     logger.info("\n7️⃣ Adding country classifications...")
 
-    df['Country_Group'] = df['Country_Code'].map(config.COUNTRY_GROUPS)
-    df['Is_Turkey'] = (df['Country_Code'] == 'TUR').astype(int)
-    df['Is_Green_Leader'] = df['Country_Code'].isin(config.GREEN_LEADERS).astype(int)
-    df['Is_Turkey_Peer'] = df['Country_Code'].isin(config.TURKEY_PEERS_EMERGING).astype(int)
+    for col in ('Country_Group', 'Is_Turkey', 'Is_Green_Leader', 'Is_Turkey_Peer'):
+        df[col] = flags[col]
 
     logger.info("   ✅ Country_Group, Is_Turkey, Is_Green_Leader, Is_Turkey_Peer")
 
@@ -254,26 +580,19 @@ def create_derived_features(df):
     # ========================================================================
     logger.info("\n8️⃣ Creating interaction terms...")
 
-    # Green transition × Energy importer (key hypothesis!)
-    if 'Renewable_Energy_Consumption_Pct' in df.columns:
-        df['Green_X_Importer'] = (
-                df['Renewable_Energy_Consumption_Pct'] * df['Is_Energy_Importer']
-        )
-        logger.info("   ✅ Green_X_Importer")
-
-    # Green transition × Development level
-    if 'Renewable_Energy_Consumption_Pct' in df.columns and 'Log_GDP_Per_Capita' in df.columns:
-        df['Green_X_Development'] = (
-                df['Renewable_Energy_Consumption_Pct'] * df['Log_GDP_Per_Capita']
-        )
-        logger.info("   ✅ Green_X_Development")
-
-    # Green transition × Post-2020
-    if 'Renewable_Energy_Consumption_Pct' in df.columns:
-        df['Green_X_Post2020'] = (
-                df['Renewable_Energy_Consumption_Pct'] * df['Post_2020']
-        )
-        logger.info("   ✅ Green_X_Post2020")
+    # Green transition × Energy importer (key hypothesis!), × Development
+    # level and × Post-2020: one broadcast multiply for all three
+    if 'Renewable_Energy_Consumption_Pct' in cols:
+        interactions = {
+            'Green_X_Importer': 'Is_Energy_Importer',
+            'Green_X_Development': 'Log_GDP_Per_Capita',
+            'Green_X_Post2020': 'Post_2020',
+        }
+        interactions = {name: col for name, col in interactions.items() if col in cols}
+        renewables = df['Renewable_Energy_Consumption_Pct'].to_numpy()[:, None]
+        df[list(interactions)] = renewables * df[list(interactions.values())].to_numpy()
+        for name in interactions:
+            logger.info(f"   ✅ {name}")
 
     logger.info(f"\n✅ Feature engineering complete. New shape: {df.shape}")
     return df
@@ -307,8 +626,8 @@ def create_turkey_comparison_dataset(df):
     })
 
     # Save
-    os.makedirs(os.path.dirname(config.TURKEY_COMPARISON_PATH), exist_ok=True)
-    df_comparison.to_csv(config.TURKEY_COMPARISON_PATH, index=False)
+    config.ensure_dirs()
+    write_csv(df_comparison, config.TURKEY_COMPARISON_PATH)
     logger.info(f"✅ Turkey comparison data saved to: {config.TURKEY_COMPARISON_PATH}")
 
     return df_comparison
@@ -321,38 +640,52 @@ def final_cleaning(df):
     logger.info("\n🧹 FINAL CLEANING")
     logger.info("=" * 60)
 
-    rows_before = len(df)
+    # All filters build one row mask; the frame is sliced once at the end
+    keep = np.ones(len(df), dtype=bool)
 
     # Remove rows where ALL green variables are missing
     green_vars_in_df = [v for v in config.GREEN_VARS if v in df.columns]
     if green_vars_in_df:
-        df = df.dropna(subset=green_vars_in_df, how='all')
-        logger.info(f"Dropped {rows_before - len(df)} rows with no green data")
+        # One isnan pass over the (float32) green block
+        keep &= ~np.isnan(df[green_vars_in_df].to_numpy()).all(axis=1)
+        logger.info(f"Dropped {len(df) - keep.sum()} rows with no green data")
 
     # Remove extreme outliers (likely data errors)
-    rows_before = len(df)
+    rows_before = keep.sum()
     if 'Inflation_CPI_Pct' in df.columns:
         # Keep hyperinflation cases but remove obvious errors (>500%)
-        df = df[df['Inflation_CPI_Pct'].abs() < 500]
+        keep &= (df['Inflation_CPI_Pct'].abs() < 500).to_numpy()
 
     if 'GDP_Growth_Pct' in df.columns:
         # Remove impossible GDP growth (>50% or <-50%)
-        df = df[df['GDP_Growth_Pct'].between(-50, 50)]
+        keep &= df['GDP_Growth_Pct'].between(-50, 50).to_numpy()
 
+    df = df[keep]
     logger.info(f"Removed {rows_before - len(df)} extreme outliers")
     logger.info(f"Final dataset: {len(df)} observations")
 
     return df
 
 
-def main():
+def main(use_cache=True):
     """
     Main preprocessing pipeline.
+
+    Args:
+        use_cache: If True, return the saved Parquet output when it is newer
+            than the raw CSV instead of re-running the pipeline
     """
     logger.info("\n" + "=" * 70)
     logger.info("🚀 GREEN TRAP ANALYSIS - PREPROCESSING")
     logger.info("=" * 70)
 
+    # 0. Short-circuit: raw data unchanged since the last run
+    if (use_cache and os.path.exists(config.PROCESSED_PARQUET_PATH)
+            and os.path.exists(config.RAW_DATA_PATH)
+            and os.path.getmtime(config.PROCESSED_PARQUET_PATH) > os.path.getmtime(config.RAW_DATA_PATH)):
+        logger.info(f"📂 Raw data unchanged, loading: {config.PROCESSED_PARQUET_PATH}")
+        return pd.read_parquet(config.PROCESSED_PARQUET_PATH)
+
     # 1. Load
     df = load_raw_data()
 
@@ -362,16 +695,18 @@ def main():
     # 3. Feature engineering
     df = create_derived_features(df)
 
-    # 4. Final cleaning
-    df = final_cleaning(df)
+    # 4. Final cleaning (fresh RangeIndex, same frame as the Parquet reload)
+    df = final_cleaning(df).reset_index(drop=True)
 
     # 5. Create Turkey comparison dataset
     df_turkey = create_turkey_comparison_dataset(df)
 
-    # 6. Save full processed dataset
-    os.makedirs(os.path.dirname(config.PROCESSED_DATA_PATH), exist_ok=True)
-    df.to_csv(config.PROCESSED_DATA_PATH, index=False)
+    # 6. Save full processed dataset (CSV for the notebooks, Parquet for fast reloads)
+    config.ensure_dirs()
+    write_csv(df, config.PROCESSED_DATA_PATH)
+    df.to_parquet(config.PROCESSED_PARQUET_PATH, compression='zstd', index=False)
     logger.info(f"\n💾 Full processed data saved to: {config.PROCESSED_DATA_PATH}")
+    logger.info(f"   Parquet copy: {config.PROCESSED_PARQUET_PATH}")
 
     # 7. Summary statistics
     logger.info("\n" + "=" * 70)
@@ -407,4 +742,5 @@ def main():
 
 
 if __name__ == "__main__":
+    config.describe()
     main()
\ No newline at end of file
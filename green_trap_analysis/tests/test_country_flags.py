@@ -0,0 +1,26 @@
+"""
+Country classification columns added by create_derived_features
+"""
+import numpy as np
+import pandas as pd
+
+from src import preprocessor
+
+
+def test_missing_country_gets_no_flags():
+    # TUR is the last category, so a wrapped code -1 would read its flags
+    countries = pd.Categorical(['DEU', 'DEU', 'TUR', 'TUR', np.nan], categories=['DEU', 'TUR'])
+    df = pd.DataFrame({
+        'Country_Code': countries,
+        'Year': [2000, 2001, 2000, 2001, 2001],
+        'Renewable_Energy_Consumption_Pct': np.array([10, 11, 12, 13, 14], dtype=np.float32),
+    })
+
+    out = preprocessor.create_derived_features(df)
+
+    tur = out.iloc[2]
+    assert (tur['Is_Turkey'], tur['Is_Energy_Importer'], tur['Is_Turkey_Peer']) == (1, 1, 1)
+    missing = out.iloc[4]
+    assert missing[['Is_Turkey', 'Is_Energy_Importer', 'Is_Green_Leader', 'Is_Turkey_Peer']].eq(0).all()
+    assert pd.isna(missing['Country_Group'])
+    assert out['Is_Energy_Importer'].dtype == np.int8
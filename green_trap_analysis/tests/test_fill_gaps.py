@@ -0,0 +1,104 @@
+"""
+Gap filling in smart_imputation: the interpolation kernel and _fill_gaps
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import preprocessor
+
+
+def _panel(seed, dtype=np.float64, n_cols=3, nan_frac=0.4):
+    """Random panel sorted by country then year, with gaps."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 15, rng.integers(1, 6))
+    countries = np.repeat([f'C{i}' for i in range(len(lengths))], lengths)
+    values = (rng.normal(size=(len(countries), n_cols)) * 100).astype(dtype)
+    values[rng.random(values.shape) < nan_frac] = np.nan
+    df = pd.DataFrame(values, columns=[f'v{k}' for k in range(n_cols)])
+    df.insert(0, 'Country_Code', pd.Categorical(countries))
+    return df
+
+
+def _kernel(name):
+    """The numpy interpolation, or the numba-compiled loop (skipped without numba)."""
+    if name == 'numpy':
+        return preprocessor._interp_inside
+    kernel = preprocessor._interp_kernel()
+    if kernel is None:
+        pytest.skip('numba not installed')
+    return kernel
+
+
+@pytest.mark.parametrize('seed', range(50))
+@pytest.mark.parametrize('kernel', ['numpy', 'numba'])
+def test_interp_inside_matches_pandas(kernel, seed):
+    df = _panel(seed)
+    cols = list(df.columns[1:])
+    expected = df.groupby('Country_Code', observed=True)[cols].transform(
+        lambda s: s.interpolate(method='linear', limit=2, limit_area='inside')
+    )
+
+    values = df[cols].to_numpy(copy=True)
+    starts, stops = preprocessor._country_bounds(df['Country_Code'].to_numpy())
+    _kernel(kernel)(values, starts, stops, 2)
+
+    np.testing.assert_array_equal(values, expected.to_numpy())
+
+
+def test_fill_gaps_on_read_only_arrays():
+    # A single float block built without a copy: to_numpy() on a column
+    # selection hands back a read-only view
+    # Columns: a (forward fill), b (backward fill edge), c (interior gap)
+    values = np.array([[1.0, np.nan, 3.0], [np.nan, 2.0, 4.0], [3.0, np.nan, 5.0]]).T
+    values.setflags(write=False)
+    df = pd.DataFrame(values, columns=['a', 'b', 'c'], copy=False)
+    df['Country_Code'] = pd.Categorical(['X', 'X', 'X'])
+
+    preprocessor._fill_gaps(df, ['a'], ['b', 'c'])
+
+    assert df[['a', 'b', 'c']].notna().all().all()
+    assert df.loc[1, 'c'] == 4.0
+
+
+def _reference_fill(df, ff_vars, interpolate_vars):
+    """The fill rules applied one country at a time with plain pandas."""
+    def fill(block):
+        block = block.copy()
+        block[ff_vars] = block[ff_vars].ffill(limit=3)
+        block[interpolate_vars] = block[interpolate_vars].interpolate(
+            method='linear', limit=2, limit_area='inside'
+        )
+        cols = ff_vars + interpolate_vars
+        block[cols] = block[cols].bfill(limit=1)
+        return block[cols]
+
+    return pd.concat([fill(block) for _, block in df.groupby('Country_Code', sort=False, observed=True)])
+
+
+def _use_backend(monkeypatch, backend):
+    """Points _fill_gaps at one interpolation kernel regardless of panel size."""
+    if backend == 'numba':
+        _kernel('numba')
+        monkeypatch.setattr(preprocessor, '_NUMBA_MIN_ROWS', 0)
+    else:
+        monkeypatch.setattr(preprocessor, '_NUMBA_MIN_ROWS', float('inf'))
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('backend', ['numba', 'numpy'])
+def test_fill_gaps_backends_agree(monkeypatch, backend, seed):
+    rng = np.random.default_rng(seed)
+    df = _panel(seed, nan_frac=rng.uniform(0.2, 0.7), n_cols=4)
+    df[['v2', 'v3']] = df[['v2', 'v3']].astype(np.float32)
+    # Country blocks out of category order and a shuffled, non-range index
+    blocks = [block for _, block in df.groupby('Country_Code', observed=True)]
+    df = pd.concat([blocks[i] for i in rng.permutation(len(blocks))])
+    df.index = rng.permutation(len(df)) * 10
+    ff_vars, interpolate_vars = ['v0', 'v2'], ['v1', 'v3']
+    expected = _reference_fill(df, ff_vars, interpolate_vars)
+
+    _use_backend(monkeypatch, backend)
+    preprocessor._fill_gaps(df, ff_vars, interpolate_vars)
+
+    pd.testing.assert_frame_equal(df[ff_vars + interpolate_vars], expected)
@@ -0,0 +1,102 @@
+"""
+The aiohttp fetch path of _wdi, against a stubbed session
+"""
+import asyncio
+import types
+
+import pytest
+
+from src import _wdi
+
+
+class _ClientError(Exception):
+    pass
+
+
+class _Session:
+    """Stands in for aiohttp.ClientSession; `outcomes` maps indicator to a list of results."""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = {}
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, timeout=None):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, params=None):
+        indicator = url.rsplit('/', 1)[-1]
+        attempt = self.calls.get(indicator, 0)
+        self.calls[indicator] = attempt + 1
+        return _Response(self, self.outcomes[indicator][attempt])
+
+
+class _Response:
+    def __init__(self, session, outcome):
+        self.session = session
+        self.outcome = outcome
+
+    async def __aenter__(self):
+        self.session.in_flight += 1
+        self.session.peak = max(self.session.peak, self.session.in_flight)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.session.in_flight -= 1
+        return False
+
+    def raise_for_status(self):
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+
+    async def json(self, content_type=None):
+        await asyncio.sleep(0.001)
+        return [{}, [{'countryiso3code': 'TUR', 'date': '2020', 'value': self.outcome}]]
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(outcomes):
+        stub = _Session(outcomes)
+        monkeypatch.setattr(_wdi, 'aiohttp', types.SimpleNamespace(
+            ClientError=_ClientError, ClientTimeout=lambda total: None, ClientSession=stub,
+        ))
+        monkeypatch.setattr(_wdi, '_RETRY_DELAY_S', 0)
+        return stub
+    return install
+
+
+def test_concurrency_capped_by_max_workers(session):
+    stub = session({f'I{k}': [float(k)] for k in range(10)})
+    requests = [(f'I{k}', 2020, 2020) for k in range(10)]
+
+    results = _wdi._fetch_chunks_async(requests, ['TUR'], max_workers=3, max_retries=1)
+
+    assert len(results) == 10
+    assert stub.peak == 3
+
+
+@pytest.mark.parametrize('max_retries', [1, 2, 3])
+def test_attempts_follow_max_retries(session, max_retries):
+    stub = session({'OK': [_ClientError('503'), _ClientError('503'), 1.0]})
+
+    results = _wdi._fetch_chunks_async([('OK', 2020, 2020)], ['TUR'], max_workers=8, max_retries=max_retries)
+
+    assert stub.calls['OK'] == max_retries
+    assert len(results) == (1 if max_retries == 3 else 0)
+
+
+def test_cancelled_request_is_dropped(session):
+    session({'A': [1.0], 'B': [asyncio.CancelledError()]})
+
+    results = _wdi._fetch_chunks_async([('A', 2020, 2020), ('B', 2020, 2020)], ['TUR'],
+                                       max_workers=8, max_retries=1)
+
+    assert [indicator for indicator, _ in results] == ['A']
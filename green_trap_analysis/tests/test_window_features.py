@@ -0,0 +1,48 @@
+"""
+Per-country window features: the pandas and Polars paths of _window_features
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import preprocessor
+
+
+def _panel(seed):
+    """Random panel sorted by country then year, with every source column."""
+    rng = np.random.default_rng(seed)
+    countries = [f'C{i}' for i in range(rng.integers(2, 6))]
+    years = np.arange(2000, 2000 + rng.integers(3, 12))
+    df = pd.DataFrame({
+        'Country_Code': pd.Categorical(np.repeat(countries, len(years))),
+        'Year': np.tile(years, len(countries)),
+    })
+    sources = {*preprocessor._DIFF_FEATURES.values(), *preprocessor._VOLATILITY_FEATURES.values(),
+               *preprocessor._PCT_CHANGE_FEATURES.values(), *preprocessor._LAG_VARS,
+               'Carbon_Intensity_CO2_Per_GDP'} - {'Green_Transition_Speed'}
+    for col in sorted(sources):
+        values = rng.normal(50, 20, len(df))
+        values[rng.random(len(df)) < 0.2] = np.nan
+        df[col] = values.astype(np.float64 if col in preprocessor._OUTCOME_VARS else np.float32)
+    return df
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_polars_matches_pandas(seed):
+    if not preprocessor._polars_available():
+        pytest.skip('polars >= 1.21 not installed')
+    df = _panel(seed)
+
+    expected = preprocessor._window_features_pandas(df)
+    result = preprocessor._window_features_polars(df)
+
+    pd.testing.assert_frame_equal(result[expected.columns], expected)
+
+
+def test_small_panels_use_pandas(monkeypatch):
+    # Calling the Polars path would raise TypeError
+    monkeypatch.setattr(preprocessor, '_window_features_polars', None)
+    df = _panel(0)
+
+    assert len(df) < preprocessor._POLARS_MIN_ROWS
+    preprocessor._window_features(df)